@@ -3,9 +3,16 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
+import os
+import queue
 import traceback
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from threading import Lock, Thread
 from typing import Any, Dict, List, Optional
@@ -13,15 +20,23 @@ from uuid import uuid4
 
 from flask import (
     Flask,
+    Response,
     abort,
-    jsonify,
     redirect,
     render_template,
     request,
     url_for,
 )
 
-from game import Game
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 环境缺少 orjson 时退回标准库
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - 环境缺少 msgspec 时退回完整解析
+    msgspec = None
 
 # 项目根目录
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -40,76 +55,229 @@ DEFAULT_PLAYER_CONFIGS = [
     {"name": "Gemini", "model": "gemini-2.0-flash-thinking"},
 ]
 
-# 游戏任务状态缓存
-GAME_TASKS: Dict[str, Dict[str, Any]] = {}
+# 游戏任务状态缓存（容量有上限，溢出时淘汰最旧的任务）
+GAME_TASKS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 GAME_TASK_LOCK = Lock()
+_MAX_TASK_HISTORY = 256
+
+# 运行中的任务数，避免每次请求全量扫描 GAME_TASKS
+_RUNNING_COUNT = 0
+
+
+def _loads(data: bytes) -> Any:
+    """解析 JSON 字节串，优先使用 orjson。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj: Any) -> Any:
+    """序列化钩子：将 msgspec Struct 按属性名转为字典。"""
+    if msgspec is not None and isinstance(obj, msgspec.Struct):
+        return msgspec.structs.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(payload: Any) -> bytes:
+    """序列化 JSON，优先使用 orjson。"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_json_default)
+    return json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+
 
+def _json_response(payload: Any, status: int = 200) -> Response:
+    """构造 JSON 响应，绕过 jsonify 的标准库序列化。"""
+    return Response(_dumps(payload), status=status, mimetype="application/json")
 
-def _encode_path(relative_path: Path) -> str:
+
+@lru_cache(maxsize=4096)
+def _encode_path(relative_path: str) -> str:
     """将记录的相对路径编码为 URL 安全的字符串。"""
-    return base64.urlsafe_b64encode(str(relative_path).encode("utf-8")).decode("ascii").rstrip("=")
+    # 在字节串上完成 rstrip，整个链路只做一次 decode
+    return base64.urlsafe_b64encode(relative_path.encode("utf-8", "surrogatepass")).rstrip(b"=").decode("ascii")
 
 
+@lru_cache(maxsize=4096)
 def _decode_path(identifier: str) -> Path:
     """从编码字符串解码出记录的相对路径。"""
     padding = "=" * (-len(identifier) % 4)
-    decoded = base64.urlsafe_b64decode((identifier + padding).encode("ascii")).decode("utf-8")
+    decoded = base64.urlsafe_b64decode((identifier + padding).encode("ascii")).decode("utf-8", "surrogatepass")
     return Path(decoded)
 
 
+# 允许目录的解析结果在导入时计算一次，避免每次请求都调用 Path.resolve
+_RESOLVED_ALLOWED_ROOTS = tuple(str(directory.resolve()) + os.sep for directory in RECORD_DIRECTORIES)
+
+
 def _is_allowed_path(path: Path) -> bool:
     """确保访问的记录在允许的目录之内。"""
     try:
-        resolved = path.resolve(strict=True)
-    except FileNotFoundError:
+        resolved = os.path.realpath(path, strict=True)
+    except (OSError, ValueError):
+        # 非法路径（如包含空字节）直接视为不允许
         return False
 
+    # 追加分隔符后前缀匹配即可同时覆盖“等于根目录”与“位于根目录之下”
+    probe = resolved + os.sep
+    return any(probe.startswith(root) for root in _RESOLVED_ALLOWED_ROOTS)
+
+
+if msgspec is not None:
+
+    class RecordSummary(msgspec.Struct):
+        """列表页所需字段的记录视图，rounds 保持原始字节不做深层解析。"""
+
+        game_id: Optional[str] = None
+        player_names: List[str] = []
+        winner: Optional[str] = None
+        rounds: List[msgspec.Raw] = []
+
+    class PlayEvent(msgspec.Struct, rename={"player": "player_name"}):
+        """单次出牌事件，字段名与 API 输出一致，解码时由 rename 映射磁盘字段。"""
+
+        player: Optional[str] = None
+        played_cards: List[str] = []
+        behavior: Optional[str] = None
+        play_reason: Optional[str] = None
+        was_challenged: Optional[bool] = None
+        challenge_reason: Optional[str] = None
+        challenge_result: Optional[bool] = None
+        next_player: Optional[str] = None
+
+    class RoundDetail(msgspec.Struct, rename={"history": "play_history"}):
+        """单个回合的详情视图。"""
+
+        round_id: Optional[int] = None
+        target_card: Optional[str] = None
+        starting_player: Optional[str] = None
+        round_result: Optional[Dict[str, Any]] = None
+        history: List[PlayEvent] = []
+
+    class RecordDetail(msgspec.Struct, rename={"players": "player_names"}):
+        """整场对局的详情视图。"""
+
+        game_id: Optional[str] = None
+        players: List[str] = []
+        winner: Optional[str] = None
+        rounds: List[RoundDetail] = []
+
+    # 解码器只需构建一次，按目标结构特化后跨请求复用
+    _SUMMARY_DECODER = msgspec.json.Decoder(RecordSummary)
+    _DETAIL_DECODER = msgspec.json.Decoder(RecordDetail)
+
+
+def _parse_summary(raw: bytes) -> tuple:
+    """从记录的原始 JSON 字节中提取 (game_id, players, winner, round_count)。"""
+    if msgspec is not None:
+        summary = _SUMMARY_DECODER.decode(raw)
+        return summary.game_id, summary.player_names, summary.winner, len(summary.rounds)
+
+    data = _loads(raw)
+    return data.get("game_id"), data.get("player_names", []), data.get("winner"), len(data.get("rounds", []))
+
+
+# 记录列表缓存：目录级整体缓存 + 文件级摘要缓存
+_RECORDS_CACHE: Dict[str, Any] = {"key": None, "value": None}
+_RECORDS_CACHE_LOCK = Lock()
+_SUMMARY_CACHE: Dict[str, tuple] = {}
+
+
+def _records_cache_key() -> tuple:
+    """根据各记录目录的 mtime、文件数及最新文件 mtime 生成缓存键。
+
+    对局进行中记录文件会被原地重写（目录 mtime 不变），
+    因此额外纳入最新文件的 mtime 以保证缓存及时失效。
+    """
+    key = []
     for directory in RECORD_DIRECTORIES:
         try:
-            if resolved.is_relative_to(directory.resolve()):
-                return True
-        except AttributeError:
-            # Python < 3.9 没有 Path.is_relative_to
-            try:
-                resolved.relative_to(directory.resolve())
-            except ValueError:
-                continue
-            else:
-                return True
-    return False
+            st = os.stat(directory)
+        except OSError:
+            continue
+        count = 0
+        latest_ns = 0
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    count += 1
+                    mtime_ns = entry.stat().st_mtime_ns
+                    if mtime_ns > latest_ns:
+                        latest_ns = mtime_ns
+        key.append((st.st_mtime_ns, count, latest_ns))
+    return tuple(key)
+
+
+def _parse_one_record(args: tuple) -> Optional[tuple]:
+    """解析单个记录文件，返回 (mtime, record_info)，失败时返回 None。"""
+    # st 来自扫描阶段 DirEntry 缓存的 stat 结果，无需再次系统调用
+    path, name, source, st = args
+    try:
+        game_id, players, winner, round_count = _parse_summary(Path(path).read_bytes())
+    except Exception:
+        return None
 
+    record_info = {
+        "id": _encode_path(str(Path(path).relative_to(BASE_DIR))),
+        "name": name,
+        "source": source,
+        "game_id": game_id,
+        "players": players,
+        "winner": winner,
+        "round_count": round_count,
+        "updated_at": datetime.fromtimestamp(st.st_mtime).isoformat(timespec="seconds"),
+    }
+    _SUMMARY_CACHE[path] = (st.st_mtime_ns, st.st_size, record_info)
+    return (st.st_mtime, record_info)
 
-def _collect_records() -> List[Dict]:
-    """读取所有可用记录的简要信息。"""
-    records: List[Dict] = []
+
+def _collect_records(cache_key: Optional[tuple] = None) -> tuple:
+    """读取所有可用记录的简要信息，返回 (records, aggregates)。"""
+    if cache_key is None:
+        cache_key = _records_cache_key()
+    with _RECORDS_CACHE_LOCK:
+        if _RECORDS_CACHE["key"] == cache_key:
+            return _RECORDS_CACHE["value"]
+
+    collected: List[tuple] = []
+    pending: List[tuple] = []
     for directory in RECORD_DIRECTORIES:
         if not directory.exists():
             continue
-        for record_path in sorted(directory.glob("*.json")):
-            try:
-                data = json.loads(record_path.read_text(encoding="utf-8"))
-            except Exception:
+        source = str(directory.relative_to(BASE_DIR))
+        with os.scandir(directory) as it:
+            entries = [entry for entry in it if entry.is_file() and entry.name.endswith(".json")]
+        for entry in entries:
+            # DirEntry 缓存了 stat 结果，避免重复系统调用
+            st = entry.stat()
+            cached = _SUMMARY_CACHE.get(entry.path)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                collected.append((st.st_mtime, cached[2]))
                 continue
+            pending.append((entry.path, entry.name, source, st))
+
+    # 并发读取未命中缓存的文件，掩盖文件系统延迟
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(32, len(pending))) as executor:
+            for result in executor.map(_parse_one_record, pending):
+                if result is not None:
+                    collected.append(result)
 
-            record_info = {
-                "id": _encode_path(record_path.relative_to(BASE_DIR)),
-                "name": record_path.name,
-                "source": str(record_path.parent.relative_to(BASE_DIR)),
-                "game_id": data.get("game_id"),
-                "players": data.get("player_names", []),
-                "winner": data.get("winner"),
-                "round_count": len(data.get("rounds", [])),
-                "updated_timestamp": record_path.stat().st_mtime,
-                "updated_at": datetime.fromtimestamp(record_path.stat().st_mtime).isoformat(timespec="seconds"),
-            }
-            records.append(record_info)
+    # 最近修改的记录排在最前，同时在同一趟循环里完成统计聚合
+    collected.sort(key=itemgetter(0), reverse=True)
+    records: List[Dict] = []
+    winners: Counter = Counter()
+    players_seen: set = set()
+    for _, record_info in collected:
+        records.append(record_info)
+        winners[record_info["winner"] or "未知"] += 1
+        players_seen.update(record_info["players"])
 
-    # 最近修改的记录排在最前
-    records.sort(key=lambda item: item["updated_timestamp"], reverse=True)
-    for record in records:
-        record.pop("updated_timestamp", None)
+    result = (records, {"winners": winners, "players": players_seen})
+    with _RECORDS_CACHE_LOCK:
+        _RECORDS_CACHE["key"] = cache_key
+        _RECORDS_CACHE["value"] = result
 
-    return records
+    return result
 
 
 def _normalize_players(raw_players: Any) -> Optional[List[Dict[str, str]]]:
@@ -134,8 +302,63 @@ def _normalize_players(raw_players: Any) -> Optional[List[Dict[str, str]]]:
     return normalized
 
 
+# 游戏任务队列与常驻工作线程
+_GAME_QUEUE: queue.Queue = queue.Queue()
+_GAME_WORKER: Optional[Thread] = None
+
+
+def _run_game(task_id: str, player_configs: List[Dict[str, str]]) -> None:
+    """执行单场游戏任务并更新其状态。
+
+    CPython 中字典单项赋值在 GIL 下是原子操作，
+    因此状态写入无需持有 GAME_TASK_LOCK。
+    """
+    global _RUNNING_COUNT
+
+    task = GAME_TASKS[task_id]
+    try:
+        # 延迟导入：只读面板无需加载游戏及各 LLM SDK
+        from game import Game
+
+        game = Game(player_configs)
+        game.start_game()
+
+        record_path = (BASE_DIR / "game_records" / f"{game.game_record.game_id}.json").resolve()
+        relative_path = record_path.relative_to(BASE_DIR)
+
+        task["record_id"] = _encode_path(str(relative_path))
+        task["record_path"] = str(relative_path)
+        task["status"] = "finished"
+    except Exception as exc:  # noqa: BLE001 - 需要捕获所有异常便于返回错误信息
+        traceback.print_exc()
+        task["error"] = str(exc)
+        task["status"] = "failed"
+    finally:
+        with GAME_TASK_LOCK:
+            _RUNNING_COUNT -= 1
+
+
+def _game_worker_loop() -> None:
+    """常驻工作线程：按提交顺序执行排队的游戏任务。"""
+    while True:
+        task_id, player_configs = _GAME_QUEUE.get()
+        try:
+            _run_game(task_id, player_configs)
+        finally:
+            _GAME_QUEUE.task_done()
+
+
+def _ensure_game_worker() -> None:
+    """按需启动常驻工作线程，调用方需持有 GAME_TASK_LOCK。"""
+    global _GAME_WORKER
+    if _GAME_WORKER is None or not _GAME_WORKER.is_alive():
+        _GAME_WORKER = Thread(target=_game_worker_loop, name="game-worker", daemon=True)
+        _GAME_WORKER.start()
+
+
 def _create_game_task(player_configs: List[Dict[str, str]]) -> str:
-    """在后台线程中启动新的游戏任务。"""
+    """注册新的游戏任务并放入队列。"""
+    global _RUNNING_COUNT
 
     task_id = uuid4().hex
 
@@ -147,54 +370,37 @@ def _create_game_task(player_configs: List[Dict[str, str]]) -> str:
             "record_path": None,
             "error": None,
         }
+        while len(GAME_TASKS) > _MAX_TASK_HISTORY:
+            GAME_TASKS.popitem(last=False)
+        _RUNNING_COUNT += 1
+        _ensure_game_worker()
 
-    def _run_game() -> None:
-        try:
-            game = Game(player_configs)
-            game.start_game()
-
-            record_path = (BASE_DIR / "game_records" / f"{game.game_record.game_id}.json").resolve()
-            relative_path = record_path.relative_to(BASE_DIR)
-            record_id = _encode_path(relative_path)
-
-            with GAME_TASK_LOCK:
-                GAME_TASKS[task_id]["status"] = "finished"
-                GAME_TASKS[task_id]["record_id"] = record_id
-                GAME_TASKS[task_id]["record_path"] = str(relative_path)
-        except Exception as exc:  # noqa: BLE001 - 需要捕获所有异常便于返回错误信息
-            traceback.print_exc()
-            with GAME_TASK_LOCK:
-                GAME_TASKS[task_id]["status"] = "failed"
-                GAME_TASKS[task_id]["error"] = str(exc)
-
-    worker = Thread(target=_run_game, name=f"game-task-{task_id[:8]}", daemon=True)
-    worker.start()
+    _GAME_QUEUE.put((task_id, player_configs))
     return task_id
 
 
-def _build_summary(records: List[Dict]) -> Dict:
-    """根据记录列表生成统计信息。"""
-    total = len(records)
-    winners: Dict[str, int] = {}
-    for record in records:
-        winner = record.get("winner") or "未知"
-        winners[winner] = winners.get(winner, 0) + 1
-
+def _build_summary(records: List[Dict], aggregates: Dict) -> Dict:
+    """将收集阶段预聚合的统计信息格式化为摘要。"""
     winner_breakdown = [
         {"name": name, "count": count}
-        for name, count in sorted(winners.items(), key=lambda item: item[1], reverse=True)
+        for name, count in aggregates["winners"].most_common()
     ]
 
     return {
-        "total_records": total,
-        "unique_players": sorted({player for record in records for player in record.get("players", [])}),
+        "total_records": len(records),
+        "unique_players": sorted(aggregates["players"]),
         "winner_breakdown": winner_breakdown,
     }
 
 
-def _load_record_detail(record_path: Path) -> Dict:
+def _load_record_detail(record_path: Path) -> Any:
     """读取单场对局的详细信息并清洗结构。"""
-    data = json.loads(record_path.read_text(encoding="utf-8"))
+    raw = record_path.read_bytes()
+    if msgspec is not None:
+        # 直接解码为类型化视图，省去逐事件重建字典
+        return _DETAIL_DECODER.decode(raw)
+
+    data = _loads(raw)
     rounds = []
     for round_data in data.get("rounds", []):
         history = []
@@ -226,6 +432,12 @@ def _load_record_detail(record_path: Path) -> Dict:
     }
 
 
+@lru_cache(maxsize=128)
+def _load_record_detail_cached(path_str: str, mtime_ns: int, size: int) -> bytes:
+    """缓存序列化后的对局详情，键中的 mtime 与文件大小保证失效。"""
+    return _dumps(_load_record_detail(Path(path_str)))
+
+
 def create_app() -> Flask:
     """创建并返回 Flask 应用。"""
     app = Flask(__name__, template_folder="templates", static_folder="static")
@@ -242,7 +454,7 @@ def create_app() -> Flask:
             if not _is_allowed_path(target_path):
                 abort(404)
 
-            encoded = _encode_path(target_path.relative_to(BASE_DIR))
+            encoded = _encode_path(str(target_path.relative_to(BASE_DIR)))
             return redirect(url_for("index", record=encoded))
 
         return render_template("index.html")
@@ -256,14 +468,25 @@ def create_app() -> Flask:
         target_path = (BASE_DIR / Path(record_relative)).resolve(strict=True)
         if not _is_allowed_path(target_path):
             abort(404)
-        encoded = _encode_path(target_path.relative_to(BASE_DIR))
+        encoded = _encode_path(str(target_path.relative_to(BASE_DIR)))
         return redirect(url_for("index", record=encoded))
 
     @app.get("/api/records")
     def api_records():
-        records = _collect_records()
-        summary = _build_summary(records)
-        return jsonify({"records": records, "summary": summary})
+        cache_key = _records_cache_key()
+        etag = hashlib.blake2b(repr(cache_key).encode(), digest_size=8).hexdigest()
+
+        # 记录未变化时直接返回 304，省去序列化与传输
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            records, aggregates = _collect_records(cache_key)
+            summary = _build_summary(records, aggregates)
+            response = _json_response({"records": records, "summary": summary})
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
 
     @app.get("/api/records/<string:record_id>")
     def api_record_detail(record_id: str):
@@ -272,10 +495,11 @@ def create_app() -> Flask:
         if not _is_allowed_path(full_path):
             abort(404)
         try:
-            detail = _load_record_detail(full_path)
+            st = os.stat(full_path)
+            body = _load_record_detail_cached(str(full_path), st.st_mtime_ns, st.st_size)
         except FileNotFoundError:
             abort(404)
-        return jsonify(detail)
+        return Response(body, mimetype="application/json")
 
     @app.post("/api/games")
     def api_start_game():
@@ -284,18 +508,18 @@ def create_app() -> Flask:
         normalized_players = _normalize_players(raw_players)
 
         if raw_players is not None and normalized_players is None:
-            return jsonify({"error": "players 字段格式错误，需要包含 name 和 model 的对象数组"}), 400
+            return _json_response({"error": "players 字段格式错误，需要包含 name 和 model 的对象数组"}, status=400)
 
         player_configs = normalized_players or DEFAULT_PLAYER_CONFIGS
 
         with GAME_TASK_LOCK:
-            running = any(task.get("status") == "running" for task in GAME_TASKS.values())
+            running = _RUNNING_COUNT > 0
 
         if running:
-            return jsonify({"error": "已有对局正在运行，请稍后再试"}), 409
+            return _json_response({"error": "已有对局正在运行，请稍后再试"}, status=409)
 
         task_id = _create_game_task(player_configs)
-        return jsonify({"task_id": task_id, "status": "running"}), 202
+        return _json_response({"task_id": task_id, "status": "running"}, status=202)
 
     @app.get("/api/games/<string:task_id>")
     def api_game_status(task_id: str):
@@ -315,11 +539,35 @@ def create_app() -> Flask:
             response["record_id"] = task["record_id"]
             response["record_path"] = task.get("record_path")
 
-        return jsonify(response)
+        return _json_response(response)
 
     return app
 
 
+def _serve(application: Flask) -> None:
+    """优先用 gunicorn 的 gthread worker 启动，未安装时退回开发服务器。"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # Flask 自带服务器为单线程，仅建议开发调试使用
+        application.run(host="0.0.0.0", port=8000, debug=True, threaded=True)
+        return
+
+    class _GunicornServer(BaseApplication):
+        """以多线程 worker 运行应用，重叠各请求的阻塞式 JSON I/O。"""
+
+        def load_config(self):
+            self.cfg.set("bind", "0.0.0.0:8000")
+            # 任务状态保存在进程内存中（GAME_TASKS），必须保持单进程
+            self.cfg.set("workers", 1)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", 8)
+
+        def load(self):
+            return application
+
+    _GunicornServer().run()
+
+
 if __name__ == "__main__":
-    application = create_app()
-    application.run(host="0.0.0.0", port=8000, debug=True)
+    _serve(create_app())